@@ -1,12 +1,31 @@
-import difflib
+from contextlib import asynccontextmanager
 
+import httpx
+import numpy as np
+import orjson
 import pandas as pd
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from rapidfuzz import fuzz, process
 
-from core import SPOTS_FILE, calculate_physics_score, fetch_single_station_data
+from core import (
+    STATION_TIMEOUT,
+    afetch_station_pair,
+    calculate_physics_score,
+    load_spots,
+)
+
+# Shared HTTP client (keeps NOAA connections pooled between requests)
+http_client = httpx.AsyncClient(timeout=STATION_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await http_client.aclose()
 
-app = FastAPI(title="Swell AI API", version="2.0")
+
+app = FastAPI(title="Swell AI API", version="2.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,46 +34,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load DB
+# Load DB (plain records - no DataFrame needed to serve requests)
 try:
-    spots_df = pd.read_json(SPOTS_FILE)
-    print(f"✅ Loaded {len(spots_df)} spots.")
+    SPOTS = load_spots()
+    print(f"✅ Loaded {len(SPOTS)} spots.")
 except Exception:
-    spots_df = pd.DataFrame()
+    SPOTS = []
+
+# Lookup indexes (built once, so requests don't rescan the DB)
+SPOT_BY_NAME = {}
+INDICES_BY_NAME = {}  # Exact name -> every spot index carrying it
+for i, record in enumerate(SPOTS):
+    SPOT_BY_NAME.setdefault(record["name"].lower(), record)  # First match wins
+    INDICES_BY_NAME.setdefault(record["name"], []).append(i)
+NAMES = [s["name"] for s in SPOTS]
+LOWER_NAMES = np.array([name.lower() for name in NAMES], dtype=str)
+
+# Only return what the map needs (bandwidth optimization)
+# Serialized once: the payload never changes while the process is up
+ALL_SPOTS_BLOB = orjson.dumps(
+    [
+        {"name": s["name"], "lat": s["lat"], "lng": s["lng"], "country": s["country"]}
+        for s in SPOTS
+    ]
+)
 
 
 @app.get("/all")
 def get_all_spots():
-    if spots_df.empty:
-        return []
-    # Only return what the map needs (bandwidth optimization)
-    return spots_df[["name", "lat", "lng", "country"]].to_dict(orient="records")
+    return Response(content=ALL_SPOTS_BLOB, media_type="application/json")
 
 
 @app.get("/search")
 def search_spots(q: str):
-    if spots_df.empty:
-        return []
-    results = spots_df[spots_df["name"].str.contains(q, case=False, na=False)]
-    if results.empty:
-        matches = difflib.get_close_matches(
-            q, spots_df["name"].tolist(), n=5, cutoff=0.6
-        )
-        results = spots_df[spots_df["name"].isin(matches)]
-    return results[["name", "country", "lat", "lng"]].to_dict(orient="records")
+    hits = np.flatnonzero(np.char.find(LOWER_NAMES, q.lower()) >= 0)
+    if hits.size == 0:
+        matches = {
+            m[0]
+            for m in process.extract(
+                q, NAMES, scorer=fuzz.WRatio, limit=5, score_cutoff=60
+            )
+        }
+        # Every spot sharing a matched name, in DB order
+        hits = sorted(i for name in matches for i in INDICES_BY_NAME[name])
+    return [
+        {
+            "name": SPOTS[i]["name"],
+            "country": SPOTS[i]["country"],
+            "lat": SPOTS[i]["lat"],
+            "lng": SPOTS[i]["lng"],
+        }
+        for i in hits
+    ]
+
+
+def fmt_temp(val):
+    # Helper for safe formatting
+    return f"{val:.1f}°F" if pd.notna(val) and val != 0 else "--"
 
 
 @app.get("/live/{spot_name}")
-def get_live_report(spot_name: str):
+async def get_live_report(spot_name: str):
     # 1. Find Spot
-    match = spots_df[spots_df["name"].str.lower() == spot_name.lower()]
-    if match.empty:
+    spot = SPOT_BY_NAME.get(spot_name.lower())
+    if spot is None:
         raise HTTPException(404, "Spot not found")
-    spot = match.iloc[0]
 
-    # 2. Fetch Data (Using Core)
-    swell_data = fetch_single_station_data(str(spot["primary_buoy_id"]))
-    wind_data = fetch_single_station_data(str(spot["wind_station_id"]))
+    # 2. Fetch Data (Using Core) - both stations in parallel
+    swell_data, wind_data = await afetch_station_pair(
+        str(spot["primary_buoy_id"]), str(spot["wind_station_id"]), http_client
+    )
 
     if swell_data is None and wind_data is None:
         raise HTTPException(503, "Offline")
@@ -86,10 +135,6 @@ def get_live_report(spot_name: str):
         physics_data.get("SwellPeriod", 0.0),
     )
 
-    # 4. Helper for safe formatting
-    def fmt_temp(val):
-        return f"{val:.1f}°F" if pd.notna(val) and val != 0 else "--"
-
     return {
         "name": spot["name"],
         "location": spot["country"],  # Added Location Label
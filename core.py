@@ -1,101 +1,215 @@
+import asyncio
+import math
+import time
+from functools import lru_cache
+
 import numpy as np
+import orjson
 import pandas as pd
+from numba import njit, prange
 
 # --- CONFIGURATION ---
 SPOTS_FILE = "master_surf_spots.json"
+STATION_CACHE_TTL = 300  # seconds (NOAA realtime2 updates every ~10 min)
+STATION_TIMEOUT = 10.0  # seconds per NOAA request
 
 
-def fetch_single_station_data(station_id):
+@lru_cache(maxsize=1)
+def load_spots():
     """
-    Fetches live data for a single station ID from NOAA.
+    Loads the spot DB once per process (list of dicts, straight from orjson).
     Used by: main.py, api.py
     """
+    with open(SPOTS_FILE, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def station_url(station_id):
     # FIX: Add .upper() to handle IDs like 'yktv2' correctly
-    url = f"https://www.ndbc.noaa.gov/data/realtime2/{station_id.upper()}.txt"
+    return f"https://www.ndbc.noaa.gov/data/realtime2/{station_id.upper()}.txt"
+
+
+# The newest reading is on line 3, so never download the full history
+STATION_RANGE_HEADERS = {"Range": "bytes=0-4096"}
+
+
+def _to_float(val):
+    # NOAA marks missing readings as 'MM'
     try:
-        # 1. Parse using Pandas (Robust handling of whitespace and missing values)
-        df = pd.read_csv(url, sep=r"\s+", skiprows=[1], na_values="MM")
-
-        # 2. Rename Columns (Added WaterTemp and AirTemp)
-        df = df.rename(
-            columns={
-                "WDIR": "WindDir",
-                "WSPD": "WindSpeed",
-                "GST": "WindGust",
-                "WVHT": "SwellHeight",
-                "DPD": "SwellPeriod",
-                "WTMP": "WaterTemp",  # <--- NEW
-                "ATMP": "AirTemp",  # <--- NEW
-            }
-        )
+        return float(val)
+    except ValueError:
+        return float("nan")
+
+
+def parse_station_data(text):
+    """
+    Parses the latest reading out of a realtime2 station file.
+    Only the first 3 lines matter: header, units, newest observation.
+    """
+    # 1. Parse the header + newest row by hand (no full CSV parse)
+    lines = text.splitlines()
+    headers = lines[0].lstrip("#").split()
+    values = lines[2].split()
+    row = {h: _to_float(v) for h, v in zip(headers, values)}
+
+    # 2. Rename Columns (Added WaterTemp and AirTemp)
+    renames = {
+        "WDIR": "WindDir",
+        "WSPD": "WindSpeed",
+        "GST": "WindGust",
+        "WVHT": "SwellHeight",
+        "DPD": "SwellPeriod",
+        "WTMP": "WaterTemp",  # <--- NEW
+        "ATMP": "AirTemp",  # <--- NEW
+    }
+    row = {renames.get(k, k): v for k, v in row.items()}
+
+    # 3. Convert Units
+    row["WindSpeed"] *= 1.94384  # m/s -> knots
+    row["WindGust"] *= 1.94384
+    row["SwellHeight"] *= 3.28084  # m -> ft
 
-        # 3. Convert Units
-        df["WindSpeed"] *= 1.94384  # m/s -> knots
-        df["WindGust"] *= 1.94384
-        df["SwellHeight"] *= 3.28084  # m -> ft
+    # 4. Temp Conversion (Celsius -> Fahrenheit)
+    # Check if columns exist first (some buoys don't have Air Temp)
+    if "WaterTemp" in row:
+        row["WaterTemp"] = row["WaterTemp"] * 9 / 5 + 32
 
-        # 4. Temp Conversion (Celsius -> Fahrenheit)
-        # Check if columns exist first (some buoys don't have Air Temp)
-        if "WaterTemp" in df.columns:
-            df["WaterTemp"] = df["WaterTemp"] * 9 / 5 + 32
+    if "AirTemp" in row:
+        row["AirTemp"] = row["AirTemp"] * 9 / 5 + 32
 
-        if "AirTemp" in df.columns:
-            df["AirTemp"] = df["AirTemp"] * 9 / 5 + 32
+    return pd.Series(row, dtype=float)
 
-        return df.iloc[0].copy()
+
+# Station reading cache: (station_id, time_bucket) -> Series
+_station_cache = {}
+
+
+def _cache_key(station_id):
+    return station_id, int(time.time() // STATION_CACHE_TTL)
+
+
+def _cache_get(key):
+    # Callers mutate the Series, so never hand out the cached object
+    return _station_cache[key].copy()
+
+
+def _cache_put(key, data):
+    # Drop readings from expired buckets before storing the fresh one
+    for old_key in [k for k in _station_cache if k[1] != key[1]]:
+        del _station_cache[old_key]
+    _station_cache[key] = data
+
+
+async def afetch_single_station_data(station_id, client):
+    """
+    Fetches live data for a single station ID from NOAA.
+    Results are cached per STATION_CACHE_TTL window.
+    client: an httpx.AsyncClient, so callers can gather() several stations.
+    """
+    key = _cache_key(station_id)
+    if key in _station_cache:
+        return _cache_get(key)
+    try:
+        resp = await client.get(station_url(station_id), headers=STATION_RANGE_HEADERS)
+        resp.raise_for_status()
+        data = parse_station_data(resp.text)
     except Exception as e:
         # print(f"Debug Error: {e}") # Uncomment to debug
-        return None
+        return None  # Not cached: the next request retries
+    _cache_put(key, data)
+    return _cache_get(key)
 
 
-def calculate_physics_score(
+async def afetch_station_pair(swell_id, wind_id, client):
+    """
+    Fetches a spot's swell + wind stations concurrently.
+    Spots wired to one station for both only hit NOAA once.
+    Used by: main.py, api.py
+    """
+    if swell_id == wind_id:
+        data = await afetch_single_station_data(swell_id, client)
+        # Callers merge wind into the swell Series, so keep them separate
+        return data, data.copy() if data is not None else None
+    return await asyncio.gather(
+        afetch_single_station_data(swell_id, client),
+        afetch_single_station_data(wind_id, client),
+    )
+
+
+@njit(cache=True)
+def _score_scalar(
     beach_facing_deg, wind_dir, wind_speed, wind_gust, swell_height, swell_period
 ):
     """
-    The Universal Physics Engine.
-    Magic: This works for a SINGLE number (float) OR an entire COLUMN (pandas Series).
+    Scalar fast path of the Physics Engine (same math, no NumPy dispatch).
+    Used by: api.py (/live), main.py
     """
-    # 1. Geometry (Vector Math)
-    beach_rad = np.radians(90 - beach_facing_deg)
-    wind_rad = np.radians(90 - wind_dir)
-
-    # Dot Product (Element-wise multiplication allows this to work on Arrays too)
-    dot = (np.cos(beach_rad) * np.cos(wind_rad)) + (
-        np.sin(beach_rad) * np.sin(wind_rad)
+    beach_rad = math.radians(90.0 - beach_facing_deg)
+    wind_rad = math.radians(90.0 - wind_dir)
+    dot = math.cos(beach_rad) * math.cos(wind_rad) + math.sin(beach_rad) * math.sin(
+        wind_rad
     )
+    wind_score = ((dot * -1.0) + 1.0) / 2.0 * 100.0
 
-    # Wind Quality Score (100 = Offshore, 0 = Onshore)
-    wind_score = ((dot * -1) + 1) / 2 * 100
-
-    # 2. Penalties using np.where (Safe for Arrays and Scalars)
-    # Glassy Bonus: If wind < 5, force score to 100
-    wind_score = np.where(wind_speed < 5.0, 100.0, wind_score)
+    # Glassy Bonus
+    if wind_speed < 5.0:
+        wind_score = 100.0
 
     # Gust Penalty
     gust_diff = wind_gust - wind_speed
-    penalty = (gust_diff - 5.0) * 2.0
-    penalty = np.where(penalty < 0, 0, penalty)  # Clamp at 0
+    if gust_diff > 5.0:
+        wind_score -= (gust_diff - 5.0) * 2.0
+    wind_score = min(100.0, max(0.0, wind_score))
 
-    # Apply penalty only if gust_diff > 5
-    wind_score = np.where(gust_diff > 5.0, wind_score - penalty, wind_score)
+    # Swell Power Score
+    power = (swell_height**2) * swell_period
+    power_score = min(100.0, max(0.0, (power / 300.0) * 100.0))
 
-    # FIX: Corrected variable name from wind_scores -> wind_score
-    wind_score = (
-        np.clip(wind_score, 0, 100)
-        if isinstance(wind_score, np.ndarray)
-        else max(0, min(100, wind_score))
-    )
+    return (wind_score * 0.6) + (power_score * 0.4)
 
-    # 3. Swell Power Score
-    power = (swell_height**2) * swell_period
-    power_score = (power / 300.0) * 100.0
-    power_score = (
-        np.clip(power_score, 0, 100)
-        if isinstance(power_score, np.ndarray)
-        else min(power_score, 100)
-    )
 
-    # 4. Final Weighted Score
-    final = (wind_score * 0.6) + (power_score * 0.4)
+@njit(parallel=True, cache=True)
+def _score_kernel(beach, wdir, wspd, wgst, swh, spd, out):
+    """
+    Fused array version of _score_scalar: writes every score in a single pass.
+    Used by: scan.py (via calculate_physics_score)
+    """
+    for i in prange(out.shape[0]):
+        out[i] = _score_scalar(beach[i], wdir[i], wspd[i], wgst[i], swh[i], spd[i])
+
+
+def calculate_physics_score(
+    beach_facing_deg, wind_dir, wind_speed, wind_gust, swell_height, swell_period
+):
+    """
+    The Universal Physics Engine.
+    Magic: This works for a SINGLE number (float) OR an entire COLUMN (pandas Series).
+    Single numbers go to _score_scalar, columns to the fused _score_kernel.
+    """
+    if isinstance(wind_dir, (int, float, np.integer, np.floating)):
+        return _score_scalar(
+            float(beach_facing_deg),
+            float(wind_dir),
+            float(wind_speed),
+            float(wind_gust),
+            float(swell_height),
+            float(swell_period),
+        )
 
-    return final
+    # Arrays/Series: one fused pass instead of ~10 temporary arrays
+    columns = np.broadcast_arrays(
+        *(
+            np.asarray(col)
+            for col in (
+                beach_facing_deg,
+                wind_dir,
+                wind_speed,
+                wind_gust,
+                swell_height,
+                swell_period,
+            )
+        )
+    )
+    out = np.empty(columns[0].shape, dtype=np.float64)
+    _score_kernel(*(np.ravel(col) for col in columns), out.reshape(-1))
+    return out
@@ -1,9 +1,9 @@
 import datetime
-import json
 import os
 import sys
 
 import numpy as np
+import orjson
 import requests
 import xarray as xr
 
@@ -109,9 +109,9 @@ def process_grib():
     u_comp = -height * np.sin(rads)
     v_comp = -height * np.cos(rads)
 
-    # Cleanup NaNs
-    u_comp = np.nan_to_num(u_comp, nan=0.0)
-    v_comp = np.nan_to_num(v_comp, nan=0.0)
+    # Cleanup NaNs (float32 is plenty for a map overlay and halves the grid)
+    u_comp = np.nan_to_num(u_comp, nan=0.0).astype(np.float32)
+    v_comp = np.nan_to_num(v_comp, nan=0.0).astype(np.float32)
 
     # Coords
     lat = ds["latitude"].values
@@ -134,7 +134,7 @@ def process_grib():
                 "la2": float(lat[-1]),
                 "refTime": datetime.datetime.now().isoformat(),
             },
-            "data": u_comp.flatten().tolist(),
+            "data": u_comp.ravel(),
         },
         {
             "header": {
@@ -151,15 +151,16 @@ def process_grib():
                 "la2": float(lat[-1]),
                 "refTime": datetime.datetime.now().isoformat(),
             },
-            "data": v_comp.flatten().tolist(),
+            "data": v_comp.ravel(),
         },
     ]
 
     os.makedirs("public", exist_ok=True)
 
     print("💾 Saving JSON...")
-    with open(OUTPUT_FILE, "w") as f:
-        json.dump(output, f)
+    # OPT_SERIALIZE_NUMPY encodes the grids straight from their buffers
+    with open(OUTPUT_FILE, "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_SERIALIZE_NUMPY))
 
     print(f"🎉 Success! Swell data saved to {OUTPUT_FILE}")
 
@@ -1,9 +1,22 @@
-import difflib
+import asyncio
 import sys
 
+import httpx
 import pandas as pd
+from rapidfuzz import fuzz, process
 
-from core import SPOTS_FILE, calculate_physics_score, fetch_single_station_data
+from core import (
+    STATION_TIMEOUT,
+    afetch_station_pair,
+    calculate_physics_score,
+    load_spots,
+)
+
+
+async def fetch_pair(s_id, w_id):
+    # Both NOAA downloads run concurrently over one connection pool
+    async with httpx.AsyncClient(timeout=STATION_TIMEOUT) as client:
+        return await afetch_station_pair(s_id, w_id, client)
 
 
 def get_dual_data(spot):
@@ -11,8 +24,7 @@ def get_dual_data(spot):
     s_id, w_id = str(spot["primary_buoy_id"]), str(spot["wind_station_id"])
     print(f"   🌊 Swell: {s_id} | 💨 Wind: {w_id}")
 
-    s_data = fetch_single_station_data(s_id)
-    w_data = fetch_single_station_data(w_id)
+    s_data, w_data = asyncio.run(fetch_pair(s_id, w_id))
 
     if s_data is None and w_data is None:
         return None
@@ -31,22 +43,22 @@ if __name__ == "__main__":
         sys.exit(0)
 
     try:
-        df = pd.read_json(SPOTS_FILE)
+        spots = load_spots()
     except:
         sys.exit(1)
 
     # Fuzzy Find
     query = sys.argv[1]
-    match = df[df["name"].str.lower() == query.lower()]
-    if match.empty:
-        closest = difflib.get_close_matches(query, df["name"].tolist(), n=1)
+    spot = next((s for s in spots if s["name"].lower() == query.lower()), None)
+    if spot is None:
+        closest = process.extractOne(
+            query, [s["name"] for s in spots], scorer=fuzz.WRatio, score_cutoff=60
+        )
         if closest:
             print(f"🔎 Using: {closest[0]}")
-            spot = df[df["name"] == closest[0]].iloc[0]
+            spot = spots[closest[2]]
         else:
             sys.exit(1)
-    else:
-        spot = match.iloc[0]
 
     # Run Engine
     print(f"\n🏄‍♂️ REPORT: {spot['name'].upper()}")
@@ -1,7 +1,7 @@
-import json
-import math
-
+import numpy as np
+import orjson
 import pandas as pd
+from scipy.spatial import cKDTree
 
 # --- CONFIG ---
 DATA_URL = "https://www.ndbc.noaa.gov/data/latest_obs/latest_obs.txt"
@@ -9,15 +9,30 @@ BUOYS_FILE = "all_noaa_buoys.json"  # We'll keep this as the "Swell" source of t
 SPOTS_FILE = "master_surf_spots.json"
 
 
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Earth radius km
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat / 2) * math.sin(dlat / 2) + math.cos(
-        math.radians(lat1)
-    ) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) * math.sin(dlon / 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+def to_unit_xyz(lats, lons):
+    # Project lat/lon (degrees) onto the unit sphere.
+    # Straight-line distance here is monotonic in great-circle distance,
+    # so the KD-Tree nearest neighbour is the true nearest station.
+    lat_rad = np.radians(np.asarray(lats, dtype=float))
+    lon_rad = np.radians(np.asarray(lons, dtype=float))
+    return np.column_stack(
+        (
+            np.cos(lat_rad) * np.cos(lon_rad),
+            np.cos(lat_rad) * np.sin(lon_rad),
+            np.sin(lat_rad),
+        )
+    )
+
+
+def nearest_station_ids(stations, spot_xyz):
+    if not stations:
+        return [None] * len(spot_xyz)  # Nothing to link to, leave spots as-is
+    station_xyz = to_unit_xyz(
+        [s["lat"] for s in stations], [s["lon"] for s in stations]
+    )
+    tree = cKDTree(station_xyz)
+    _, idxs = tree.query(spot_xyz, k=1)
+    return [stations[i]["id"] for i in idxs]
 
 
 def refresh():
@@ -46,69 +61,51 @@ def refresh():
     print(f"    - Active Wind Sources:  {len(wind_df)}")
 
     # Helper to convert DataFrame to List of Dicts
+    # (Column-wise extraction, no per-row Series boxing)
     def df_to_list(dataframe):
-        stations = []
-        for _, row in dataframe.iterrows():
-            stations.append(
-                {
-                    "id": str(row["#STN"]),
-                    "lat": float(row["LAT"]),
-                    "lon": float(row["LON"]),
-                }
-            )
-        return stations
+        ids = dataframe["#STN"].astype(str).tolist()
+        lats = dataframe["LAT"].astype(float).tolist()
+        lons = dataframe["LON"].astype(float).tolist()
+        return [
+            {"id": stn, "lat": lat, "lon": lon}
+            for stn, lat, lon in zip(ids, lats, lons)
+        ]
 
     swell_stations = df_to_list(swell_df)
     wind_stations = df_to_list(wind_df)
 
     # Save just the swell stations to the JSON file (for the API to use if needed)
-    with open(BUOYS_FILE, "w") as f:
-        json.dump(swell_stations, f, indent=2)
+    with open(BUOYS_FILE, "wb") as f:
+        f.write(orjson.dumps(swell_stations, option=orjson.OPT_INDENT_2))
 
     # 3. RELINK SPOTS (Dual-Channel)
     print(f"🔗 Optimizing Spot Connections...")
 
-    with open(SPOTS_FILE, "r") as f:
-        spots = json.load(f)
+    with open(SPOTS_FILE, "rb") as f:
+        spots = orjson.loads(f.read())
 
     swell_updates = 0
     wind_updates = 0
 
-    for spot in spots:
-        target_lat = spot["lat"]
-        target_lon = spot["lng"]
-
-        # --- A. Find Best SWELL Source ---
-        best_swell_id = None
-        min_swell_dist = float("inf")
-
-        for s in swell_stations:
-            dist = haversine(target_lat, target_lon, s["lat"], s["lon"])
-            if dist < min_swell_dist:
-                min_swell_dist = dist
-                best_swell_id = s["id"]
+    # Project every spot once, then let the KD-Trees do the searching
+    spot_xyz = to_unit_xyz([s["lat"] for s in spots], [s["lng"] for s in spots])
+    best_swell_ids = nearest_station_ids(swell_stations, spot_xyz)
+    best_wind_ids = nearest_station_ids(wind_stations, spot_xyz)
 
+    for spot, best_swell_id, best_wind_id in zip(spots, best_swell_ids, best_wind_ids):
+        # --- A. Best SWELL Source ---
         if best_swell_id and spot.get("primary_buoy_id") != best_swell_id:
             spot["primary_buoy_id"] = best_swell_id
             swell_updates += 1
 
-        # --- B. Find Best WIND Source ---
-        best_wind_id = None
-        min_wind_dist = float("inf")
-
-        for s in wind_stations:
-            dist = haversine(target_lat, target_lon, s["lat"], s["lon"])
-            if dist < min_wind_dist:
-                min_wind_dist = dist
-                best_wind_id = s["id"]
-
+        # --- B. Best WIND Source ---
         if best_wind_id and spot.get("wind_station_id") != best_wind_id:
             spot["wind_station_id"] = best_wind_id
             wind_updates += 1
 
     # 4. SAVE
-    with open(SPOTS_FILE, "w") as f:
-        json.dump(spots, f, indent=2)
+    with open(SPOTS_FILE, "wb") as f:
+        f.write(orjson.dumps(spots, option=orjson.OPT_INDENT_2))
 
     print(f"✅ Database Optimized.")
     print(f"    - Re-routed {swell_updates} swell connections.")
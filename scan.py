@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from core import calculate_physics_score
+
 # --- CONFIGURATION ---
 SPOTS_FILE = "master_surf_spots.json"
 NOAA_MASTER_URL = "https://www.ndbc.noaa.gov/data/latest_obs/latest_obs.txt"
@@ -16,9 +18,14 @@ def scan_the_world():
 
     print("📡 2. Downloading Live Buoy Data...")
     try:
-        # Load data, turning 'MM' into NaN
+        # Load data, turning 'MM' into NaN (only the columns we score on)
         raw_buoys = pd.read_csv(
-            NOAA_MASTER_URL, sep=r"\s+", skiprows=[1], na_values="MM"
+            NOAA_MASTER_URL,
+            sep=r"\s+",
+            skiprows=[1],
+            na_values="MM",
+            usecols=["#STN", "WDIR", "WSPD", "GST", "WVHT", "DPD"],
+            dtype={"#STN": str},
         )
     except Exception as e:
         print(f"❌ API Error: {e}")
@@ -42,11 +49,26 @@ def scan_the_world():
     raw_buoys["SwellHeight"] *= 3.28084
 
     # Prep for Merge
-    buoy_data = raw_buoys.copy()
-    buoy_data["station_id"] = buoy_data["station_id"].astype(str)
+    buoy_data = raw_buoys
     spots_df["primary_buoy_id"] = spots_df["primary_buoy_id"].astype(str)
     spots_df["wind_station_id"] = spots_df["wind_station_id"].astype(str)
 
+    # Shared categories turn both joins into integer-code comparisons
+    station_ids = pd.CategoricalDtype(
+        categories=pd.unique(
+            np.concatenate(
+                [
+                    spots_df["primary_buoy_id"].to_numpy(),
+                    spots_df["wind_station_id"].to_numpy(),
+                    buoy_data["station_id"].to_numpy(),
+                ]
+            )
+        )
+    )
+    spots_df["primary_buoy_id"] = spots_df["primary_buoy_id"].astype(station_ids)
+    spots_df["wind_station_id"] = spots_df["wind_station_id"].astype(station_ids)
+    buoy_data["station_id"] = buoy_data["station_id"].astype(station_ids)
+
     # 3. MERGE
     print("🔗 3. Linking Data...")
 
@@ -82,36 +104,28 @@ def scan_the_world():
     )
     print(f"   ⚡ Scorable Spots: {len(df)}")
 
-    # Fill remaining NaNs (only Gusts can be 0 if missing)
-    df["WindGust"] = df["WindGust"].fillna(0)
-    df = df.fillna(0)  # Safety net
-
-    # 5. VECTOR SCORING
-    beach_rad = np.radians(90 - df["beach_facing_deg"])
-    wind_rad = np.radians(90 - df["WindDir"])
-
-    dot = (np.cos(beach_rad) * np.cos(wind_rad)) + (
-        np.sin(beach_rad) * np.sin(wind_rad)
+    # Fill remaining NaNs (only the scoring columns, not the whole frame)
+    # float32 halves the columns read by the kernel (math still runs in float64)
+    score_cols = [
+        "beach_facing_deg",
+        "WindDir",
+        "WindSpeed",
+        "WindGust",
+        "SwellHeight",
+        "SwellPeriod",
+    ]
+    df[score_cols] = df[score_cols].fillna(0.0).astype(np.float32, copy=False)
+
+    # 5. VECTOR SCORING (fused kernel in core.py)
+    df["final_score"] = calculate_physics_score(
+        df["beach_facing_deg"].to_numpy(),
+        df["WindDir"].to_numpy(),
+        df["WindSpeed"].to_numpy(),
+        df["WindGust"].to_numpy(),
+        df["SwellHeight"].to_numpy(),
+        df["SwellPeriod"].to_numpy(),
     )
 
-    wind_scores = ((dot * -1) + 1) / 2 * 100
-
-    # Glassy Bonus (Real glassy, not fake glassy)
-    wind_scores = np.where(df["WindSpeed"] < 5.0, 100.0, wind_scores)
-
-    # Gust Penalty
-    gust_diff = df["WindGust"] - df["WindSpeed"]
-    wind_scores = np.where(
-        gust_diff > 5.0, wind_scores - (gust_diff - 5.0) * 2, wind_scores
-    )
-    wind_scores = np.clip(wind_scores, 0, 100)
-
-    # Swell Score
-    power = (df["SwellHeight"] ** 2) * df["SwellPeriod"]
-    power_scores = np.clip((power / 300.0) * 100.0, 0, 100)
-
-    df["final_score"] = (wind_scores * 0.6) + (power_scores * 0.4)
-
     # 6. REPORT
     # Filter for significant swell (> 2ft)
     df = df[df["SwellHeight"] > 2.0]